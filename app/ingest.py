@@ -3,6 +3,8 @@ import json
 import time
 import requests
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 DB_NAME = "advisormatch.db"
@@ -16,15 +18,51 @@ HEADERS = {
     "User-Agent": "mailto:test@advisormatch.edu"
 }
 MAX_PAPERS_PER_PROF = 5
+MAX_WORKERS = 4 # Concurrent OpenAlex lookups, kept small for the polite pool
+BATCH_SIZE = 50 # Professors per write transaction
+
+# SQLite tuning applied to every new connection.
+# WAL is persisted in the database file, so readers opened later inherit it.
+CONN_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA cache_size = -65536;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA busy_timeout = 5000;
+"""
+
+def open_conn(path):
+    """
+    Open a SQLite connection with the tuned PRAGMAs applied.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript(CONN_PRAGMAS)
+    return conn
+
+# One requests.Session per worker thread: requests does not promise that a
+# Session is thread-safe, but each worker still reuses its own connections.
+_thread_local = threading.local()
+
+def get_session():
+    """
+    Return the calling thread's OpenAlex session, creating it on first use.
+    """
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        _thread_local.session = session
+    return session
 
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
+    conn = open_conn(DB_NAME)
     with open(SCHEMA_FILE, 'r') as f:
         conn.executescript(f.read())
     conn.commit()
     return conn
 
-def search_openalex_author(name):
+def search_openalex_author(name, log=print):
     """
     Search OpenAlex for an author.
     Filters results to find one affiliated with Texas A&M.
@@ -36,9 +74,9 @@ def search_openalex_author(name):
     }
 
     try:
-        r = requests.get(base_url, params=params, headers=HEADERS)
+        r = get_session().get(base_url, params=params)
         if r.status_code != 200:
-            print(f"  [!] API Error: {r.status_code}")
+            log(f"  [!] API Error: {r.status_code}")
             return None
 
         results = r.json().get('results', [])
@@ -60,16 +98,16 @@ def search_openalex_author(name):
         # Fallback: If no affiliation match, take the top result if the name is very similar
         # (Risky, but useful for prototype if data is messy)
         if not best_match and results:
-            print(f"  [!] No explicit TAMU match for {name}. Using top result: {results[0]['display_name']} ({results[0]['works_count']} works)")
+            log(f"  [!] No explicit TAMU match for {name}. Using top result: {results[0]['display_name']} ({results[0]['works_count']} works)")
             best_match = results[0]
 
         return best_match['id'] if best_match else None
 
     except Exception as e:
-        print(f"  [!] Exception searching author: {e}")
+        log(f"  [!] Exception searching author: {e}")
         return None
 
-def get_openalex_works(author_id):
+def get_openalex_works(author_id, log=print):
     """
     Get works for an author ID.
     """
@@ -81,13 +119,13 @@ def get_openalex_works(author_id):
     }
 
     try:
-        r = requests.get(base_url, params=params, headers=HEADERS)
+        r = get_session().get(base_url, params=params)
         if r.status_code != 200:
             return []
 
         return r.json().get('results', [])
     except Exception as e:
-        print(f"  [!] Exception fetching works: {e}")
+        log(f"  [!] Exception fetching works: {e}")
         return []
 
 def extract_author_stats(openalex_author_id, authorships):
@@ -112,6 +150,54 @@ def extract_author_stats(openalex_author_id, authorships):
 
     return is_primary, position
 
+def fetch_professor(prof):
+    """
+    Resolve the OpenAlex author ID and recent works for one professor.
+    Runs in a worker thread, so it only talks to the network, never SQLite.
+    Log lines are returned rather than printed so the main thread can show
+    them under the right professor.
+    """
+    messages = []
+    oa_id = prof.get('openalex_author_id')
+
+    if not oa_id:
+        messages.append(f"  [?] ID not provided. Searching OpenAlex for {prof['name']}...")
+        oa_id = search_openalex_author(prof['name'], log=messages.append)
+
+    works = get_openalex_works(oa_id, log=messages.append) if oa_id else []
+    time.sleep(0.5) # Be polite
+    return oa_id, works, messages
+
+def write_batch(conn, pub_rows, bridge_rows, batch_count):
+    """
+    Bulk insert buffered publications and their author links, then commit.
+    Publications go first so the bridge foreign keys resolve.
+    On failure the whole batch is rolled back, reported and re-raised so the
+    run stops instead of carrying on past lost rows.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.executemany('''
+            INSERT OR IGNORE INTO publications
+            (paper_id, title, abstract, venue, year, citation_count, url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', pub_rows)
+
+        cursor.executemany('''
+            INSERT OR IGNORE INTO author_bridge
+            (professor_id, paper_id, is_primary_author, author_position)
+            VALUES (?, ?, ?, ?)
+        ''', bridge_rows)
+
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"  [!] Batch write failed, rolled back {batch_count} professors: {e}")
+        raise
+    finally:
+        pub_rows.clear()
+        bridge_rows.clear()
+
 def ingest():
     conn = init_db()
     cursor = conn.cursor()
@@ -121,78 +207,104 @@ def ingest():
 
     print(f"Starting ingestion for {len(professors)} professors using OpenAlex...")
 
-    for prof in professors:
-        print(f"\nProcessing: {prof['name']}...")
-
-        # 1. Determine Author ID (Manual input OR Search)
-        oa_id = prof.get('openalex_author_id')
-
-        if oa_id:
-            print(f"  [i] Using provided OpenAlex ID: {oa_id}")
-        else:
-            print(f"  [?] ID not provided. Searching OpenAlex for {prof['name']}...")
-            oa_id = search_openalex_author(prof['name'])
-
-        if not oa_id:
-            print(f"  [-] Not found on OpenAlex.")
-            continue
-
-        if not prof.get('openalex_author_id'):
-            print(f"  [i] Found ID: {oa_id}")
-
-        # 2. Insert Professor
-        cursor.execute('''
-            INSERT INTO professors (name, college, dept, interests, openalex_author_id)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (prof['name'], prof['college'], prof['dept'], prof['interests'], oa_id))
-        prof_db_id = cursor.lastrowid
-
-        # 3. Get Works
-        works = get_openalex_works(oa_id)
-        print(f"  [+] Found {len(works)} recent works.")
-
-        for work in works:
-            title = work.get('title')
-            paper_id = work.get('id')
-            year = work.get('publication_year')
-            cited = work.get('cited_by_count')
-
-            # Safe extraction for nested fields (venue and url)
-            venue = None
-            url = work.get('doi') # Default to DOI
+    # Publications and bridge rows are buffered and written once per batch
+    # of professors, inside a single transaction.
+    pub_rows = []
+    bridge_rows = []
+    batch_count = 0
 
-            primary_loc = work.get('primary_location')
-            if primary_loc and isinstance(primary_loc, dict):
-                # Safe extract venue
-                source = primary_loc.get('source')
-                if source and isinstance(source, dict):
-                    venue = source.get('display_name')
-
-                # Fallback URL if DOI is missing
-                if not url:
-                    url = primary_loc.get('landing_page_url')
-
-            # Simple abstract reconstruction
-            abstract = "Abstract available in full OpenAlex data"
-
-            cursor.execute('''
-                INSERT OR IGNORE INTO publications 
-                (paper_id, title, abstract, venue, year, citation_count, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (paper_id, title, abstract, venue, year, cited, url))
-
-            # 4. Link Bridge
-            is_primary, position = extract_author_stats(oa_id, work.get('authorships', []))
+    # 1. Determine Author ID (Manual input OR Search) and get works.
+    # Lookups run concurrently; results come back in input order and all
+    # SQLite writes stay on this thread.
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
 
+    try:
+        fetched = executor.map(fetch_professor, professors)
+        for prof, (oa_id, works, messages) in zip(professors, fetched):
+            print(f"\nProcessing: {prof['name']}...")
+
+            if prof.get('openalex_author_id'):
+                print(f"  [i] Using provided OpenAlex ID: {oa_id}")
+
+            for line in messages:
+                print(line)
+
+            if not oa_id:
+                print(f"  [-] Not found on OpenAlex.")
+                continue
+
+            if not prof.get('openalex_author_id'):
+                print(f"  [i] Found ID: {oa_id}")
+
+            # 2. Record Works
+            # Rows are staged per professor so a failure part way through one
+            # never leaves half of its works in the batch.
+            print(f"  [+] Found {len(works)} recent works.")
+            prof_pubs = []
+            prof_links = []
+
+            for work in works:
+                title = work.get('title')
+                paper_id = work.get('id')
+
+                # publications.title is NOT NULL; INSERT OR IGNORE would drop the
+                # row and its bridge link would then fail the foreign key.
+                if not paper_id or not title:
+                    print(f"  [!] Skipping work with missing id or title: {paper_id}")
+                    continue
+
+                year = work.get('publication_year')
+                cited = work.get('cited_by_count')
+
+                # Safe extraction for nested fields (venue and url)
+                venue = None
+                url = work.get('doi') # Default to DOI
+
+                primary_loc = work.get('primary_location')
+                if primary_loc and isinstance(primary_loc, dict):
+                    # Safe extract venue
+                    source = primary_loc.get('source')
+                    if source and isinstance(source, dict):
+                        venue = source.get('display_name')
+
+                    # Fallback URL if DOI is missing
+                    if not url:
+                        url = primary_loc.get('landing_page_url')
+
+                # Simple abstract reconstruction
+                abstract = "Abstract available in full OpenAlex data"
+
+                prof_pubs.append((paper_id, title, abstract, venue, year, cited, url))
+
+                # 3. Link Bridge
+                is_primary, position = extract_author_stats(oa_id, work.get('authorships', []))
+                prof_links.append((paper_id, is_primary, position))
+
+            # 4. Insert Professor (per row, the bridge needs lastrowid)
+            if not conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
             cursor.execute('''
-                INSERT OR IGNORE INTO author_bridge 
-                (professor_id, paper_id, is_primary_author, author_position)
-                VALUES (?, ?, ?, ?)
-            ''', (prof_db_id, paper_id, is_primary, position))
-
-        conn.commit()
-        time.sleep(0.5) # Be polite
-
+                INSERT INTO professors (name, college, dept, interests, openalex_author_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (prof['name'], prof['college'], prof['dept'], prof['interests'], oa_id))
+            prof_db_id = cursor.lastrowid
+
+            pub_rows.extend(prof_pubs)
+            bridge_rows.extend((prof_db_id, *link) for link in prof_links)
+
+            batch_count += 1
+            if batch_count == BATCH_SIZE:
+                write_batch(conn, pub_rows, bridge_rows, batch_count)
+                batch_count = 0
+    finally:
+        # Drop queued lookups so an error or Ctrl-C does not wait on them.
+        executor.shutdown(cancel_futures=True)
+
+        # Keep every fully processed professor, even if the loop stopped early.
+        if conn.in_transaction:
+            write_batch(conn, pub_rows, bridge_rows, batch_count)
+
+    conn.execute("PRAGMA optimize")
     conn.close()
     print("\nDone!")
 
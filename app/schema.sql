@@ -38,4 +38,10 @@ CREATE TABLE IF NOT EXISTS author_bridge (
     PRIMARY KEY (professor_id, paper_id),
     FOREIGN KEY (professor_id) REFERENCES professors(id) ON DELETE CASCADE,
     FOREIGN KEY (paper_id) REFERENCES publications(paper_id) ON DELETE CASCADE
-);
\ No newline at end of file
+);
+
+-- Indexes
+-- The author_bridge primary key already serves lookups by professor_id.
+-- This one covers the paper_id joins used for ranking, so SQLite answers
+-- them from the index without touching the table.
+CREATE INDEX IF NOT EXISTS idx_ab_paper_cover ON author_bridge(paper_id, professor_id, author_position, is_primary_author);